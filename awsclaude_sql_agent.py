@@ -1,18 +1,60 @@
 import streamlit as st
-from langchain_aws import ChatBedrock
+from langchain_aws import ChatBedrockConverse
 from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits import SQLDatabaseToolkit
 from langchain_community.agent_toolkits.sql.base import create_sql_agent
-from langchain.agents.agent_types import AgentType
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from sqlalchemy.exc import SQLAlchemyError
+from botocore.config import Config
 import os
+import re
 import logging
-import asyncio
 from dotenv import load_dotenv
+from event_loop import get_event_loop, run_async
+from llm_cache import LLMCache
+from query_router import answer_trivial_query, classify_query
+from semantic_cache import cache_namespace, get_semantic_cache
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Model configuration shared by the LLM and the response cache key.
+# 3.5 Sonnet v2 rather than v1 because Bedrock prompt caching only covers
+# v2 and later models
+MODEL_ID = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
+TEMPERATURE = 0.1
+# Answers are a few sentences or a small table; a tight cap stops a runaway
+# agent step from burning thousands of output tokens
+MAX_TOKENS = 1024
+
+# Caching is only safe because the temperature is low enough for repeated
+# questions to produce equivalent answers
+CACHE_ENABLED = TEMPERATURE <= 0.1
+
+# Models Bedrock accepts cachePoint blocks for; sending one to any other
+# model fails the whole request with a ValidationException
+PROMPT_CACHE_MODELS = (
+    "claude-3-5-sonnet-20241022",
+    "claude-3-5-haiku",
+    "claude-3-7-sonnet",
+    "claude-sonnet-4",
+    "claude-opus-4",
+    "claude-haiku-4",
+    "nova",
+)
+
+def supports_prompt_caching(model_id):
+    """Returns True if Bedrock supports prompt caching for the model."""
+    return any(name in model_id for name in PROMPT_CACHE_MODELS)
+
+# Exact-match response cache, held in st.cache_resource because Streamlit
+# re-executes this script from scratch on every interaction
+@st.cache_resource
+def get_response_cache():
+    """Returns the shared exact-match response cache."""
+    return LLMCache()
+
 # Set up logging
 logging.basicConfig(filename='app.log', level=logging.INFO, 
                     format='%(asctime)s - %(levelname)s - %(message)s')
@@ -57,9 +99,9 @@ def get_db_connection():
 def get_llm():
     """
     Initializes the Claude 3 Sonnet model using AWS Bedrock with credentials from .env.
-    
+
     Returns:
-        ChatBedrock: The language model object, or None if initialization fails.
+        ChatBedrockConverse: The language model object, or None if initialization fails.
     """
     try:
         # Fetch AWS credentials from environment variables
@@ -71,16 +113,23 @@ def get_llm():
         if not aws_access_key or not aws_secret_key:
             raise ValueError("AWS_ACCESS_KEY_ID or AWS_SECRET_ACCESS_KEY not set in .env")
 
-        llm = ChatBedrock(
-            model_id="us.anthropic.claude-3-5-sonnet-20240620-v1:0",
-            model_kwargs={
-                "temperature": 0.1,
-                "max_tokens": 1000
-            },
+        # The Converse API supports prompt caching natively through the
+        # cachePoint block placed in the system prompt by create_agent()
+        llm = ChatBedrockConverse(
+            model_id=MODEL_ID,
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS,
             region_name=aws_region,
             credentials_profile_name=None,  # Explicitly avoid profile-based auth
             aws_access_key_id=aws_access_key,
-            aws_secret_access_key=aws_secret_key
+            aws_secret_access_key=aws_secret_key,
+            # Keep connections alive and pooled so each ReAct step reuses the
+            # same TCP/TLS session instead of re-handshaking with Bedrock
+            config=Config(
+                tcp_keepalive=True,
+                max_pool_connections=10,
+                retries={"mode": "adaptive"}
+            )
         )
         logging.info("LLM initialized successfully")
         return llm
@@ -93,52 +142,208 @@ def get_llm():
         st.error("Failed to initialize the language model.")
         return None
 
-# Function to create the SQL agent
-def create_agent():
+# Schema introspection is expensive; share it across reruns and sessions
+@st.cache_resource(ttl=3600)
+def get_toolkit_context(_toolkit):
+    """Computes the toolkit's schema context once per hour per process."""
+    return _toolkit.get_context()
+
+# Toolkit shared by the agent and the cache-key helpers
+@st.cache_resource
+def get_toolkit():
     """
-    Creates an SQL agent with the database connection and LLM.
-    
-    Returns:
-        AgentExecutor: The SQL agent, or None if creation fails.
+    Builds the SQL toolkit once per process.
+
+    Raises:
+        RuntimeError: If the database connection or LLM failed to initialize.
     """
     db = get_db_connection()
     llm = get_llm()
     if db is None or llm is None:
-        return None
-    toolkit = SQLDatabaseToolkit(db=db, llm=llm)
+        raise RuntimeError("Database connection or LLM initialization failed")
+    return SQLDatabaseToolkit(db=db, llm=llm)
+
+def get_schema_info():
+    """Returns the cached table_info used in prompts and cache keys."""
+    return get_toolkit_context(get_toolkit()).get("table_info", "")
+
+# Function to create the SQL agent, built once per process rather than on
+# every Streamlit rerun
+@st.cache_resource
+def create_agent():
+    """
+    Creates an SQL agent with the database connection and LLM.
+
+    Returns:
+        AgentExecutor: The SQL agent.
+
+    Raises:
+        RuntimeError: If the database connection or LLM failed to initialize.
+    """
+    # get_toolkit raises rather than returning None: st.cache_resource stores
+    # return values, so a None here would pin the failure until restart, while
+    # exceptions are never cached and a fixed configuration is retried
+    toolkit = get_toolkit()
+
+    # Build the schema prefix once and, on cache-capable models, follow it
+    # with a cachePoint block so Bedrock serves it from the server-side cache
+    # on every ReAct step and every user turn, instead of re-billing the full
+    # schema as input tokens. Cache hits show up as usage_metadata cache_read
+    # tokens in the response.
+    table_info = get_schema_info()
+    system_prefix = (
+        "You are an agent designed to interact with a PostgreSQL database. "
+        "Given an input question, create a syntactically correct query to run, "
+        "then look at the results of the query and return the answer. "
+        "Only use SELECT statements; never modify the database.\n\n"
+        f"Here is information about the database:\n{table_info}"
+    )
+    system_content = [{"type": "text", "text": system_prefix}]
+    if supports_prompt_caching(MODEL_ID):
+        system_content.append({"cachePoint": {"type": "default"}})
+    prompt = ChatPromptTemplate.from_messages([
+        SystemMessage(content=system_content),
+        ("human", "{input}"),
+        MessagesPlaceholder("agent_scratchpad")
+    ])
     agent = create_sql_agent(
-        llm=llm,
+        llm=get_llm(),
         toolkit=toolkit,
-        verbose=True,
-        agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION
+        prompt=prompt,
+        agent_type="tool-calling"
     )
     logging.info("SQL agent created successfully")
     return agent
 
+# Whole words only, so everyday phrasing like "updated" or "deleted
+# accounts" isn't blocked; compiled once at import
+DANGEROUS_COMMAND_RE = re.compile(r"\b(DROP|DELETE|UPDATE|INSERT)\b", re.IGNORECASE)
+
 # Basic input validation to prevent harmful SQL commands
 def validate_input(query):
     """
     Validates the user input to prevent potentially harmful SQL commands.
-    
+
     Returns:
         bool: True if the input is safe, False otherwise.
     """
-    dangerous_commands = ["DROP", "DELETE", "UPDATE", "INSERT"]
-    if any(cmd in query.upper() for cmd in dangerous_commands):
+    if DANGEROUS_COMMAND_RE.search(query):
         logging.warning(f"Blocked potentially harmful query: {query}")
         return False
     return True
 
+# Trivial schema questions are answered from the introspected context,
+# skipping the agent (and Bedrock) entirely
+def route_trivial_query(prompt):
+    """
+    Answers list-tables/show-schema questions locally via the query router.
+
+    Returns:
+        str: The direct answer, or None when the agent should handle it.
+    """
+    intent = classify_query(prompt)
+    if intent is None:
+        return None
+    context = get_toolkit_context(get_toolkit())
+    return answer_trivial_query(
+        intent,
+        context.get("table_names", ""),
+        context.get("table_info", "")
+    )
+
+# Cache helpers shared by the blocking and streaming query paths
+def get_app_semantic_cache():
+    """Returns the semantic cache namespaced to this app's model and schema."""
+    return get_semantic_cache(cache_namespace(MODEL_ID, get_schema_info()))
+
+def lookup_cached_response(prompt):
+    """
+    Checks the exact-match and semantic caches for a previous answer.
+
+    Returns:
+        str: The cached response, or None on a miss.
+    """
+    if not CACHE_ENABLED:
+        return None
+    cache_key = LLMCache.make_key(MODEL_ID, get_schema_info(), prompt)
+    cached = get_response_cache().get(cache_key)
+    if cached is not None:
+        logging.info(f"Cache hit for query: {prompt}")
+        return cached
+    cached = get_app_semantic_cache().get(prompt)
+    if cached is not None:
+        logging.info(f"Semantic cache hit for query: {prompt}")
+    return cached
+
+def store_cached_response(prompt, response):
+    """Stores a fresh response in both caches, skipping blank answers."""
+    # Never cache an empty answer; lookup_cached_response would replay it
+    # (and the semantic cache persist it) for every similar question
+    if CACHE_ENABLED and response and response.strip():
+        cache_key = LLMCache.make_key(MODEL_ID, get_schema_info(), prompt)
+        get_response_cache().set(cache_key, response)
+        get_app_semantic_cache().set(prompt, response)
+
+# Helper to extract plain text from a streamed chunk
+def chunk_to_text(chunk):
+    """
+    Extracts plain text from a streamed chunk (Claude emits content blocks).
+
+    Returns:
+        str: The text carried by the chunk, possibly empty.
+    """
+    content = chunk.content
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+# Streaming generator for the chat input path
+def stream_agent_response(agent, prompt, result_holder):
+    """
+    Bridges the agent's async event stream into a sync generator so
+    st.write_stream can render tokens as the model emits them.
+
+    Yields:
+        str: Text chunks as they stream from the model.
+    """
+    async_gen = agent.astream_events({"input": prompt}, version="v2")
+    loop = get_event_loop()
+    while True:
+        try:
+            event = loop.run_until_complete(async_gen.__anext__())
+        except StopAsyncIteration:
+            break
+        if event["event"] == "on_chat_model_stream":
+            text = chunk_to_text(event["data"]["chunk"])
+            if text:
+                yield text
+        elif event["event"] == "on_chain_end" and not event.get("parent_ids"):
+            # Root AgentExecutor result: final output for caching/history
+            output = event["data"].get("output") or {}
+            if isinstance(output, dict):
+                result_holder.update(output)
+
 # Asynchronous function to run the agent query
 async def run_agent_query(agent, prompt):
     """
     Runs the agent query asynchronously.
-    
+
     Returns:
         str: The result of the query, or an error message.
     """
     try:
-        response = await asyncio.to_thread(agent.run, prompt)
+        routed = route_trivial_query(prompt)
+        if routed is not None:
+            logging.info(f"Routed trivial query around the agent: {prompt}")
+            return routed
+        cached = lookup_cached_response(prompt)
+        if cached is not None:
+            return cached
+        # Use the agent's native async path so the LLM and tool calls await
+        # I/O directly instead of parking a worker thread on agent.run
+        result = await agent.ainvoke({"input": prompt})
+        response = result["output"]
+        store_cached_response(prompt, response)
         logging.info(f"Query executed successfully: {prompt}")
         return response
     except Exception as e:
@@ -162,8 +367,10 @@ def main():
             st.markdown(message["content"])
     
     # Create the SQL agent
-    agent = create_agent()
-    if agent is None:
+    try:
+        agent = create_agent()
+    except Exception as e:
+        logging.error(f"Failed to create SQL agent: {str(e)}")
         st.error("Failed to initialize the SQL agent.")
         return
     
@@ -191,7 +398,7 @@ def main():
             with st.chat_message("assistant"):
                 with st.spinner("Querying database..."):
                     if validate_input(query):
-                        response = asyncio.run(run_agent_query(agent, query))
+                        response = run_async(run_agent_query(agent, query))
                         st.markdown(response)
                         st.session_state.messages.append({"role": "assistant", "content": response})
                     else:
@@ -204,10 +411,26 @@ def main():
             with st.chat_message("user"):
                 st.markdown(prompt)
             with st.chat_message("assistant"):
-                with st.spinner("Querying database..."):
-                    response = asyncio.run(run_agent_query(agent, prompt))
-                    st.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
+                cached = route_trivial_query(prompt)
+                if cached is None:
+                    cached = lookup_cached_response(prompt)
+                if cached is not None:
+                    st.markdown(cached)
+                    response = cached
+                else:
+                    # Stream tokens as the model emits them instead of
+                    # blocking until the full ReAct chain finishes
+                    result = {}
+                    try:
+                        streamed = st.write_stream(stream_agent_response(agent, prompt, result))
+                        response = result.get("output") or streamed
+                        store_cached_response(prompt, response)
+                        logging.info(f"Query executed successfully: {prompt}")
+                    except Exception as e:
+                        logging.error(f"Query execution failed: {str(e)}")
+                        response = f"Error: {str(e)}"
+                        st.error(response)
+                st.session_state.messages.append({"role": "assistant", "content": response})
         else:
             st.error("This query is not allowed.")
 
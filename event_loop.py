@@ -0,0 +1,34 @@
+import asyncio
+
+import nest_asyncio
+import streamlit as st
+
+# One long-lived event loop per process. asyncio.run created and tore down a
+# fresh loop on every message, discarding anything bound to it (such as the
+# asyncpg pool); nest_asyncio lets the same loop be re-entered from
+# Streamlit's synchronous script runs.
+
+nest_asyncio.apply()
+
+
+@st.cache_resource
+def get_event_loop():
+    """
+    Returns the shared event loop, creating it on first use.
+
+    Returns:
+        asyncio.AbstractEventLoop: The process-wide event loop.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+def run_async(coro):
+    """
+    Runs a coroutine to completion on the shared loop.
+
+    Returns:
+        The coroutine's result.
+    """
+    return get_event_loop().run_until_complete(coro)
@@ -0,0 +1,19 @@
+import httpx
+import streamlit as st
+
+# Shared HTTP client with HTTP/2 and keep-alive so repeated requests reuse
+# one multiplexed connection instead of paying a fresh TCP/TLS handshake.
+
+@st.cache_resource
+def get_httpx_client():
+    """
+    Returns the shared HTTP/2 keep-alive client, created once per process.
+
+    Returns:
+        httpx.Client: The shared client.
+    """
+    return httpx.Client(
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30.0),
+    )
@@ -0,0 +1,40 @@
+import hashlib
+
+# Shared exact-match response cache for the agent scripts. A hit is only
+# possible when the same question is asked against the same model and schema,
+# so it is only safe to use with near-deterministic sampling (temperature
+# close to 0) - callers are expected to gate on their temperature setting.
+
+
+class LLMCache:
+    """In-memory exact-match cache for LLM agent responses."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._store = {}
+
+    @staticmethod
+    def make_key(model_id, table_info, prompt):
+        """
+        Builds a cache key from the model id, schema context and prompt.
+
+        Returns:
+            str: The sha256 hex digest used as the cache key.
+        """
+        raw = f"{model_id}|{table_info}|{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Looks up a previously stored response.
+
+        Returns:
+            str: The cached response, or None on a cache miss.
+        """
+        return self._store.get(key)
+
+    def set(self, key, value):
+        """Stores a response, evicting the oldest entry when full."""
+        if len(self._store) >= self.max_entries and key not in self._store:
+            self._store.pop(next(iter(self._store)))
+        self._store[key] = value
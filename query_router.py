@@ -0,0 +1,74 @@
+import numpy as np
+import streamlit as st
+
+from semantic_cache import get_embedding_model
+
+# Embedding-based router for questions the app can answer without the LLM.
+# Schema questions ("what tables are there?") only need the context the
+# toolkit already introspected, so they are classified with the same local
+# MiniLM model the semantic cache uses and answered directly.
+
+ROUTE_THRESHOLD = 0.75
+
+INTENT_EXAMPLES = {
+    "list_tables": [
+        "what tables are there",
+        "list the tables in the database",
+        "show me all tables",
+        "which tables exist",
+        "what tables does the database contain",
+    ],
+    "show_schema": [
+        "show the database schema",
+        "describe the structure of the database",
+        "what columns do the tables have",
+        "show me the table definitions",
+        "what does the schema look like",
+    ],
+}
+
+
+@st.cache_resource
+def _intent_index():
+    """Embeds the intent examples once and returns (intents, matrix)."""
+    model = get_embedding_model()
+    intents = []
+    vectors = []
+    for intent, examples in INTENT_EXAMPLES.items():
+        for vec in model.encode(examples, normalize_embeddings=True):
+            intents.append(intent)
+            vectors.append(vec)
+    return intents, np.asarray(vectors, dtype="float32")
+
+
+def classify_query(question):
+    """
+    Classifies a question against the trivial intents.
+
+    Returns:
+        str: The intent name, or None if no example is similar enough.
+    """
+    model = get_embedding_model()
+    vec = model.encode([question], normalize_embeddings=True)[0]
+    intents, matrix = _intent_index()
+    scores = matrix @ vec
+    best = int(scores.argmax())
+    if scores[best] >= ROUTE_THRESHOLD:
+        return intents[best]
+    return None
+
+
+def answer_trivial_query(intent, table_names, table_info):
+    """
+    Builds a direct answer for a trivial intent from the cached context.
+
+    Returns:
+        str: The answer, or None for an unknown intent.
+    """
+    if intent == "list_tables":
+        names = [n.strip() for n in str(table_names).split(",") if n.strip()]
+        return ("The database contains the following tables:\n\n"
+                + "\n".join(f"- {name}" for name in names))
+    if intent == "show_schema":
+        return f"Here is the database schema:\n\n```sql\n{table_info}\n```"
+    return None
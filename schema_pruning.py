@@ -0,0 +1,49 @@
+import re
+
+# Per-query schema pruning. The toolkit's table_info dumps every table's DDL
+# and sample rows into the prompt; most questions only touch one or two
+# tables, so sending just those blocks cuts input tokens per ReAct step.
+
+CREATE_TABLE_RE = re.compile(r'CREATE TABLE\s+"?([A-Za-z_]\w*)"?', re.IGNORECASE)
+# Sample-row comments ("/* 3 rows from players table: ... */") form their own
+# blocks, so they need their own attribution pattern
+SAMPLE_ROWS_RE = re.compile(r'rows from\s+"?([A-Za-z_]\w*)"?\s+table', re.IGNORECASE)
+WORD_RE = re.compile(r"[a-z_]+")
+
+
+def _name_variants(name):
+    """Builds loose lowercase variants (singular/plural, split words) of a table name."""
+    token = name.lower()
+    variants = {token, token.rstrip("s"), token + "s"}
+    for part in token.split("_"):
+        variants.update({part, part.rstrip("s"), part + "s"})
+    return variants
+
+
+def prune_table_info(table_info, table_names, question):
+    """
+    Keeps only the schema blocks for tables the question appears to reference.
+
+    Matching is deliberately loose (singular/plural folding, underscore-split
+    words); when no table matches, the full schema is returned so the agent
+    never loses information it might need.
+
+    Returns:
+        str: The pruned (or original) table_info.
+    """
+    names = [n.strip() for n in str(table_names).split(",") if n.strip()]
+    words = set(WORD_RE.findall(question.lower()))
+    wanted = {
+        name.lower() for name in names
+        if _name_variants(name) & words
+    }
+    if not wanted:
+        return table_info
+
+    pruned = []
+    for block in table_info.split("\n\n"):
+        match = CREATE_TABLE_RE.search(block) or SAMPLE_ROWS_RE.search(block)
+        # Keep blocks we can't attribute to a table, and blocks for wanted tables
+        if match is None or match.group(1).lower() in wanted:
+            pruned.append(block)
+    return "\n\n".join(pruned) if pruned else table_info
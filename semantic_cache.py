@@ -0,0 +1,102 @@
+import hashlib
+import os
+import pickle
+
+import faiss
+import numpy as np
+import streamlit as st
+from sentence_transformers import SentenceTransformer
+
+# Embedding-similarity cache shared by the agent scripts. Unlike the
+# exact-match LLMCache, this also catches paraphrases ("How many users signed
+# up last month?" vs "Count users who joined in the previous month") that
+# compile to the same SQL. Entries are persisted to disk so the cache
+# survives app restarts, and the files are namespaced per model/schema so
+# apps answering over different databases never read each other's entries.
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+SIMILARITY_THRESHOLD = 0.92
+INDEX_PATH_TEMPLATE = "semantic_cache_{namespace}.index"
+ANSWERS_PATH_TEMPLATE = "semantic_cache_{namespace}_answers.pkl"
+
+
+def cache_namespace(model_id, table_info):
+    """
+    Derives a filesystem-safe namespace from the model and schema, so entries
+    are invalidated when either changes.
+
+    Returns:
+        str: A short hex digest identifying the model/schema pair.
+    """
+    digest = hashlib.sha256(f"{model_id}|{table_info}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class SemanticCache:
+    """Cosine-similarity cache over normalized question embeddings."""
+
+    def __init__(self, model, index_path, answers_path,
+                 threshold=SIMILARITY_THRESHOLD):
+        self.model = model
+        self.threshold = threshold
+        self.index_path = index_path
+        self.answers_path = answers_path
+        if os.path.exists(index_path) and os.path.exists(answers_path):
+            self.index = faiss.read_index(index_path)
+            with open(answers_path, "rb") as f:
+                self.answers = pickle.load(f)
+        else:
+            self.index = faiss.IndexFlatIP(model.get_sentence_embedding_dimension())
+            self.answers = []
+
+    def _embed(self, prompt):
+        # Normalized embeddings make inner product equal cosine similarity
+        vec = self.model.encode([prompt], normalize_embeddings=True)
+        return np.asarray(vec, dtype="float32")
+
+    def get(self, prompt):
+        """
+        Looks up the answer stored for the most similar previous question.
+
+        Returns:
+            str: The cached answer, or None if nothing is similar enough.
+        """
+        if self.index.ntotal == 0:
+            return None
+        scores, ids = self.index.search(self._embed(prompt), 1)
+        if scores[0][0] > self.threshold:
+            return self.answers[ids[0][0]]
+        return None
+
+    def set(self, prompt, answer):
+        """Stores an answer and persists the index and answers to disk."""
+        self.index.add(self._embed(prompt))
+        self.answers.append(answer)
+        # Persist eagerly; Streamlit offers no reliable shutdown hook
+        faiss.write_index(self.index, self.index_path)
+        with open(self.answers_path, "wb") as f:
+            pickle.dump(self.answers, f)
+
+
+@st.cache_resource
+def get_embedding_model():
+    """Loads the sentence-transformer model once per process."""
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+@st.cache_resource
+def get_semantic_cache(namespace):
+    """
+    Builds the semantic cache for a model/schema namespace once per process.
+
+    Args:
+        namespace: A cache_namespace() digest selecting the on-disk files.
+
+    Returns:
+        SemanticCache: The shared semantic cache instance for that namespace.
+    """
+    return SemanticCache(
+        get_embedding_model(),
+        index_path=INDEX_PATH_TEMPLATE.format(namespace=namespace),
+        answers_path=ANSWERS_PATH_TEMPLATE.format(namespace=namespace),
+    )
@@ -7,27 +7,26 @@ from langchain_cohere.chat_models import ChatCohere
 from langchain_community.utilities.sql_database import SQLDatabase
 from langchain_community.agent_toolkits import SQLDatabaseToolkit
 import sqlite3
-import requests
 from sqlalchemy import create_engine
 from sqlalchemy.pool import StaticPool
 from dotenv import load_dotenv
-from langsmith import Client
+from http_client import get_httpx_client
 
 # Load environment variables
 load_dotenv()
 
-# Initialize LangSmith client
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_PROJECT"] = "sql-agent-app"  # Your project name
-
-# If you have a LangSmith API key, uncomment and add it to your .env file
-# os.environ["LANGSMITH_API_KEY"] = os.getenv("LANGSMITH_API_KEY")
+# Enable LangSmith tracing only when a key is configured, and sample runs
+# instead of paying callback overhead on every request
+if os.getenv("LANGSMITH_API_KEY"):
+    os.environ["LANGCHAIN_TRACING_V2"] = "true"
+    os.environ["LANGCHAIN_PROJECT"] = "sql-agent-app"
+    os.environ.setdefault("LANGCHAIN_TRACING_SAMPLING_RATE", "0.1")
 
 # Function to initialize the Chinook database
 def get_engine_for_chinook_db():
     """Pull sql file, populate in-memory database, and create engine."""
     url = "https://raw.githubusercontent.com/lerocha/chinook-database/master/ChinookDatabase/DataSources/Chinook_Sqlite.sql"
-    response = requests.get(url)
+    response = get_httpx_client().get(url)
     sql_script = response.text
 
     connection = sqlite3.connect(":memory:", check_same_thread=False)
@@ -53,7 +52,6 @@ if "agent_executor" not in st.session_state:
     llm = ChatCohere(
         model=MODEL, 
         temperature=0.1,
-        verbose=True,
         cohere_api_key=os.getenv("COHERE_API_KEY")
     )
     toolkit = SQLDatabaseToolkit(db=db, llm=llm)
@@ -92,7 +90,6 @@ Question: {{input}}"""
     st.session_state.agent_executor = AgentExecutor(
         agent=agent,
         tools=tools,
-        verbose=True,
         return_intermediate_steps=True
     )
 